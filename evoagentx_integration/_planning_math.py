@@ -0,0 +1,54 @@
+"""
+VaultPilot Planning Math
+
+Pure numeric helpers used by the workflow processor's task planning.
+The module has no async code or external calls and is fully annotated so
+it can be compiled ahead of time with mypyc:
+
+    mypyc evoagentx_integration/_planning_math.py
+"""
+
+import re
+from typing import Dict, Final, Iterable
+
+# Leading "<number> [unit]" of a task's estimated_time, e.g. "30 minutes",
+# "2 hrs", "1.5h" or a bare "2"
+TIME_RE: Final[re.Pattern[str]] = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([a-z]*)", re.I)
+
+HOURS_PER_DAY: Final[float] = 8.0
+HOURS_PER_WEEK: Final[float] = 40.0
+
+# Hours per estimate unit and its abbreviations (working days and weeks);
+# an estimate without a unit counts in hours
+UNIT_HOURS: Final[Dict[str, float]] = {
+    "": 1.0,
+    "m": 1 / 60, "min": 1 / 60, "mins": 1 / 60, "minute": 1 / 60, "minutes": 1 / 60,
+    "h": 1.0, "hr": 1.0, "hrs": 1.0, "hour": 1.0, "hours": 1.0,
+    "d": HOURS_PER_DAY, "day": HOURS_PER_DAY, "days": HOURS_PER_DAY,
+    "w": HOURS_PER_WEEK, "wk": HOURS_PER_WEEK, "wks": HOURS_PER_WEEK,
+    "week": HOURS_PER_WEEK, "weeks": HOURS_PER_WEEK,
+}
+
+
+def total_hours(estimates: Iterable[str]) -> float:
+    """Sum estimated_time strings in hours, skipping unparseable entries"""
+    total = 0.0
+    for estimate in estimates:
+        match = TIME_RE.match(estimate)
+        if match is not None:
+            unit_hours = UNIT_HOURS.get(match.group(2).lower())
+            if unit_hours is not None:
+                total += float(match.group(1)) * unit_hours
+    return total
+
+
+def format_duration(hours: float) -> str:
+    """Render a duration in hours using the coarsest sensible unit"""
+    if hours < 1:
+        return f"{int(hours * 60)} minutes"
+    elif hours < HOURS_PER_DAY:
+        return f"{hours:.1f} hours"
+    elif hours < HOURS_PER_WEEK:
+        return f"{int(hours / HOURS_PER_DAY)} days"
+    else:
+        return f"{int(hours / HOURS_PER_WEEK)} weeks"
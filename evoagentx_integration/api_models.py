@@ -91,6 +91,7 @@ class WorkflowRequest(BaseModel):
     context: Optional[Dict[str, Any]] = Field(None, description="Additional context")
     vault_content: Optional[str] = Field(None, description="Relevant vault content")
     constraints: Optional[List[str]] = Field(None, description="Execution constraints")
+    force_replan: bool = Field(default=False, description="Bypass cached results and re-run the workflow")
 
 
 class WorkflowArtifact(BaseModel):
@@ -6,9 +6,14 @@ into actionable steps and coordinating their execution.
 """
 
 import asyncio
+import hashlib
 import json
+import time
 import uuid
-from typing import List, Dict, Any, Optional, Callable
+from array import array
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import List, Dict, Any, Optional, Callable, Union
 from datetime import datetime, timedelta
 from enum import Enum
 
@@ -17,6 +22,7 @@ from .api_models import (
     WorkflowProgress, TaskPlanningRequest, TaskPlanningResponse,
     Task, TaskPlan, Milestone
 )
+from ._planning_math import total_hours, format_duration
 
 
 class WorkflowStatus(Enum):
@@ -27,9 +33,77 @@ class WorkflowStatus(Enum):
     CANCELLED = "cancelled"
 
 
+class WorkflowCycleError(Exception):
+    """Raised when workflow step dependencies cannot be resolved"""
+    def __init__(self, remaining: int):
+        self.remaining = remaining
+        super().__init__(f"Workflow stuck: cannot resolve dependencies for {remaining} steps")
+
+
+class _ExpiringDict(MutableMapping):
+    """Insertion-ordered mapping bounded by entry count and entry age"""
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+    
+    def _expire(self):
+        # Entries share one ttl, so insertion order is also deadline order
+        now = time.monotonic()
+        while self._data:
+            key, (deadline, _) = next(iter(self._data.items()))
+            if deadline > now:
+                break
+            del self._data[key]
+    
+    def __setitem__(self, key, value):
+        self._data.pop(key, None)
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._expire()
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def __getitem__(self, key):
+        deadline, value = self._data[key]
+        if deadline <= time.monotonic():
+            del self._data[key]
+            raise KeyError(key)
+        return value
+    
+    def __delitem__(self, key):
+        del self._data[key]
+    
+    def __iter__(self):
+        self._expire()
+        return iter(self._data)
+    
+    def __len__(self):
+        self._expire()
+        return len(self._data)
+
+
+# Actions a workflow step may name; each maps to WorkflowProcessor._<name>_action
+STEP_ACTIONS = (
+    # Learning plans
+    "analyze_domain", "identify_resources", "create_curriculum", "generate_schedule", "create_tracking",
+    # Vault organization
+    "analyze_structure", "identify_patterns", "propose_structure", "create_templates", "generate_migration",
+    # Research
+    "define_scope", "literature_review", "methodology", "data_collection", "analysis_framework",
+    # Writing
+    "outline_creation", "research_gather", "draft_writing", "review_edit", "final_polish",
+    # General goals
+    "goal_analysis", "resource_identification", "action_planning", "execution_strategy", "success_metrics",
+)
+
+
 class WorkflowStep:
-    """Individual workflow step"""
-    def __init__(self, name: str, description: str, action: Callable, dependencies: Optional[List[str]] = None):
+    """Individual workflow step
+
+    ``action`` is either a coroutine function or the name of an action in
+    the processor's action registry.
+    """
+    def __init__(self, name: str, description: str, action: Union[Callable, str], dependencies: Optional[List[str]] = None):
         self.id = str(uuid.uuid4())
         self.name = name
         self.description = description
@@ -38,8 +112,45 @@ class WorkflowStep:
         self.status = WorkflowStatus.PENDING
         self.result: Optional[str] = None
         self.error: Optional[str] = None
-        self.start_time: Optional[datetime] = None
-        self.end_time: Optional[datetime] = None
+        # perf_counter() readings; converted to wall-clock only for the graph
+        self.start_time: Optional[float] = None
+        self.end_time: Optional[float] = None
+
+
+class WorkflowStepBatch:
+    """
+    Structure-of-arrays scheduling state for a workflow plan.
+    
+    Remaining dependency counts live in a flat array indexed by step
+    position, so the ready scan and dependency bookkeeping never touch the
+    per-step objects. Step status stays on the WorkflowStep objects.
+    """
+    __slots__ = ("steps", "name_to_idx", "children", "dep_count")
+    
+    def __init__(self, steps: List[WorkflowStep]):
+        self.steps = steps
+        self.name_to_idx = {step.name: i for i, step in enumerate(steps)}
+        self.children: List[List[int]] = [[] for _ in steps]
+        # Unknown dependency names are counted but never satisfied
+        self.dep_count = array("i", (len(step.dependencies) for step in steps))
+        for i, step in enumerate(steps):
+            for dep in step.dependencies:
+                parent = self.name_to_idx.get(dep)
+                if parent is not None:
+                    self.children[parent].append(i)
+    
+    def ready(self) -> List[int]:
+        """Indices of steps with no dependencies, the first layer to run"""
+        return [i for i, count in enumerate(self.dep_count) if count == 0]
+    
+    def complete(self, i: int) -> List[int]:
+        """Release step ``i``'s children and return the ones it unblocked"""
+        unblocked = []
+        for child in self.children[i]:
+            self.dep_count[child] -= 1
+            if self.dep_count[child] == 0:
+                unblocked.append(child)
+        return unblocked
 
 
 class WorkflowProcessor:
@@ -50,29 +161,47 @@ class WorkflowProcessor:
     """
     
     def __init__(self):
-        self.active_workflows = {}
+        # Bounded so entries leaked by an interrupted execution age out
+        self.active_workflows = _ExpiringDict(maxsize=1024, ttl=3600)
         self.workflow_templates = {}
-        self.progress_callbacks = {}
+        self.progress_callbacks = _ExpiringDict(maxsize=1024, ttl=3600)
+        # Completed workflow responses replayed for identical requests
+        self._result_cache = _ExpiringDict(maxsize=256, ttl=3600)
         self._setup_default_templates()
     
-    async def execute_workflow(self, request: WorkflowRequest, progress_callback: Optional[Callable] = None) -> WorkflowResponse:
+    async def execute_workflow(self, request: WorkflowRequest, progress_callback: Optional[Callable] = None,
+                               progress_as_json: bool = False) -> WorkflowResponse:
         """
         Execute a complex workflow based on user goal
         
         Args:
             request: WorkflowRequest with goal, context, and constraints
-            progress_callback: Optional callback for progress updates
+            progress_callback: Optional coroutine called with a WorkflowProgress
+                for each progress update
+            progress_as_json: Pass each update to progress_callback as
+                JSON-encoded bytes instead, serialized once per update
             
         Returns:
             WorkflowResponse with execution results and artifacts
         """
         execution_id = str(uuid.uuid4())
-        start_time = datetime.now()
+        started_at = datetime.now()
+        start_perf = time.perf_counter()
         
         try:
+            # Replay a previously completed run of the same request
+            cache_key = self._workflow_cache_key(request)
+            cached = None if request.force_replan else self._result_cache.get(cache_key)
+            if cached:
+                # Rebuilt from JSON on every hit so callers never share objects
+                response = WorkflowResponse.model_validate_json(cached)
+                response.execution_time = time.perf_counter() - start_perf
+                response.execution_id = execution_id
+                return response
+            
             # Store progress callback
             if progress_callback:
-                self.progress_callbacks[execution_id] = progress_callback
+                self.progress_callbacks[execution_id] = [(progress_callback, progress_as_json)]
             
             # Analyze goal and decompose into steps
             workflow_plan = await self._analyze_and_plan_workflow(request)
@@ -83,9 +212,9 @@ class WorkflowProcessor:
             # Generate final output and artifacts
             output, artifacts = await self._compile_workflow_results(results, request)
             
-            execution_time = (datetime.now() - start_time).total_seconds()
+            execution_time = time.perf_counter() - start_perf
             
-            return WorkflowResponse(
+            response = WorkflowResponse(
                 goal=request.goal,
                 output=output,
                 result=self._format_workflow_result(output, artifacts),
@@ -94,11 +223,14 @@ class WorkflowProcessor:
                 execution_time=execution_time,
                 execution_id=execution_id,
                 status="completed",
-                graph=self._build_execution_graph(workflow_plan, results)
+                graph=self._build_execution_graph(workflow_plan, results, started_at, start_perf)
             )
+            self._result_cache[cache_key] = response.model_dump_json(exclude={"execution_id", "execution_time"})
+            
+            return response
             
         except Exception as e:
-            execution_time = (datetime.now() - start_time).total_seconds()
+            execution_time = time.perf_counter() - start_perf
             return WorkflowResponse(
                 goal=request.goal,
                 output=f"Workflow failed: {str(e)}",
@@ -111,10 +243,17 @@ class WorkflowProcessor:
             )
         finally:
             # Cleanup
-            if execution_id in self.progress_callbacks:
-                del self.progress_callbacks[execution_id]
-            if execution_id in self.active_workflows:
-                del self.active_workflows[execution_id]
+            self.progress_callbacks.pop(execution_id, None)
+            self.active_workflows.pop(execution_id, None)
+    
+    def _workflow_cache_key(self, request: WorkflowRequest) -> tuple:
+        """Key workflow results by goal plus a digest of the other inputs"""
+        inputs = json.dumps(
+            [request.context, request.vault_content, request.constraints],
+            sort_keys=True,
+            default=str
+        )
+        return (request.goal, hashlib.sha256(inputs.encode()).hexdigest())
     
     async def plan_tasks(self, request: TaskPlanningRequest) -> TaskPlanningResponse:
         """
@@ -198,51 +337,51 @@ class WorkflowProcessor:
     async def _create_study_plan_workflow(self, request: WorkflowRequest) -> List[WorkflowStep]:
         """Create workflow for study plan creation"""
         return [
-            WorkflowStep("analyze_domain", "Analyze the subject domain", self._analyze_domain_action),
-            WorkflowStep("identify_resources", "Identify learning resources", self._identify_resources_action, ["analyze_domain"]),
-            WorkflowStep("create_curriculum", "Create learning curriculum", self._create_curriculum_action, ["identify_resources"]),
-            WorkflowStep("generate_schedule", "Generate study schedule", self._generate_schedule_action, ["create_curriculum"]),
-            WorkflowStep("create_tracking", "Create progress tracking system", self._create_tracking_action, ["generate_schedule"])
+            WorkflowStep("analyze_domain", "Analyze the subject domain", "analyze_domain"),
+            WorkflowStep("identify_resources", "Identify learning resources", "identify_resources", ["analyze_domain"]),
+            WorkflowStep("create_curriculum", "Create learning curriculum", "create_curriculum", ["identify_resources"]),
+            WorkflowStep("generate_schedule", "Generate study schedule", "generate_schedule", ["create_curriculum"]),
+            WorkflowStep("create_tracking", "Create progress tracking system", "create_tracking", ["generate_schedule"])
         ]
     
     async def _create_organization_workflow(self, request: WorkflowRequest) -> List[WorkflowStep]:
         """Create workflow for vault organization"""
         return [
-            WorkflowStep("analyze_structure", "Analyze current vault structure", self._analyze_structure_action),
-            WorkflowStep("identify_patterns", "Identify content patterns", self._identify_patterns_action, ["analyze_structure"]),
-            WorkflowStep("propose_structure", "Propose new organization structure", self._propose_structure_action, ["identify_patterns"]),
-            WorkflowStep("create_templates", "Create note templates", self._create_templates_action, ["propose_structure"]),
-            WorkflowStep("generate_migration", "Generate migration plan", self._generate_migration_action, ["create_templates"])
+            WorkflowStep("analyze_structure", "Analyze current vault structure", "analyze_structure"),
+            WorkflowStep("identify_patterns", "Identify content patterns", "identify_patterns", ["analyze_structure"]),
+            WorkflowStep("propose_structure", "Propose new organization structure", "propose_structure", ["identify_patterns"]),
+            WorkflowStep("create_templates", "Create note templates", "create_templates", ["propose_structure"]),
+            WorkflowStep("generate_migration", "Generate migration plan", "generate_migration", ["create_templates"])
         ]
     
     async def _create_research_workflow(self, request: WorkflowRequest) -> List[WorkflowStep]:
         """Create workflow for research projects"""
         return [
-            WorkflowStep("define_scope", "Define research scope", self._define_scope_action),
-            WorkflowStep("literature_review", "Conduct literature review", self._literature_review_action, ["define_scope"]),
-            WorkflowStep("methodology", "Design research methodology", self._methodology_action, ["literature_review"]),
-            WorkflowStep("data_collection", "Plan data collection", self._data_collection_action, ["methodology"]),
-            WorkflowStep("analysis_framework", "Create analysis framework", self._analysis_framework_action, ["data_collection"])
+            WorkflowStep("define_scope", "Define research scope", "define_scope"),
+            WorkflowStep("literature_review", "Conduct literature review", "literature_review", ["define_scope"]),
+            WorkflowStep("methodology", "Design research methodology", "methodology", ["literature_review"]),
+            WorkflowStep("data_collection", "Plan data collection", "data_collection", ["methodology"]),
+            WorkflowStep("analysis_framework", "Create analysis framework", "analysis_framework", ["data_collection"])
         ]
     
     async def _create_writing_workflow(self, request: WorkflowRequest) -> List[WorkflowStep]:
         """Create workflow for writing projects"""
         return [
-            WorkflowStep("outline_creation", "Create document outline", self._outline_creation_action),
-            WorkflowStep("research_gather", "Gather supporting research", self._research_gather_action, ["outline_creation"]),
-            WorkflowStep("draft_writing", "Write initial draft", self._draft_writing_action, ["research_gather"]),
-            WorkflowStep("review_edit", "Review and edit content", self._review_edit_action, ["draft_writing"]),
-            WorkflowStep("final_polish", "Final polish and formatting", self._final_polish_action, ["review_edit"])
+            WorkflowStep("outline_creation", "Create document outline", "outline_creation"),
+            WorkflowStep("research_gather", "Gather supporting research", "research_gather", ["outline_creation"]),
+            WorkflowStep("draft_writing", "Write initial draft", "draft_writing", ["research_gather"]),
+            WorkflowStep("review_edit", "Review and edit content", "review_edit", ["draft_writing"]),
+            WorkflowStep("final_polish", "Final polish and formatting", "final_polish", ["review_edit"])
         ]
     
     async def _create_generic_workflow(self, request: WorkflowRequest) -> List[WorkflowStep]:
         """Create generic workflow for undefined goals"""
         return [
-            WorkflowStep("goal_analysis", "Analyze the specified goal", self._goal_analysis_action),
-            WorkflowStep("resource_identification", "Identify required resources", self._resource_identification_action, ["goal_analysis"]),
-            WorkflowStep("action_planning", "Create action plan", self._action_planning_action, ["resource_identification"]),
-            WorkflowStep("execution_strategy", "Develop execution strategy", self._execution_strategy_action, ["action_planning"]),
-            WorkflowStep("success_metrics", "Define success metrics", self._success_metrics_action, ["execution_strategy"])
+            WorkflowStep("goal_analysis", "Analyze the specified goal", "goal_analysis"),
+            WorkflowStep("resource_identification", "Identify required resources", "resource_identification", ["goal_analysis"]),
+            WorkflowStep("action_planning", "Create action plan", "action_planning", ["resource_identification"]),
+            WorkflowStep("execution_strategy", "Develop execution strategy", "execution_strategy", ["action_planning"]),
+            WorkflowStep("success_metrics", "Define success metrics", "success_metrics", ["execution_strategy"])
         ]
     
     async def _execute_workflow_steps(self, execution_id: str, steps: List[WorkflowStep], request: WorkflowRequest) -> Dict[str, Any]:
@@ -254,45 +393,43 @@ class WorkflowProcessor:
             "status": WorkflowStatus.RUNNING
         }
         
-        completed_steps = set()
+        # Kahn's algorithm over the batch arrays: peel layers of steps whose
+        # remaining dependency count has dropped to zero
+        batch = WorkflowStepBatch(steps)
+        remaining = len(steps)
         results = {}
+        layer = batch.ready()
         
-        while len(completed_steps) < len(steps):
-            # Find steps ready to execute
-            ready_steps = [
-                step for step in steps 
-                if step.status == WorkflowStatus.PENDING and 
-                all(dep in completed_steps for dep in step.dependencies)
-            ]
-            
-            if not ready_steps:
-                # Check if we're stuck
-                pending_steps = [step for step in steps if step.status == WorkflowStatus.PENDING]
-                if pending_steps:
-                    raise Exception(f"Workflow stuck: cannot resolve dependencies for {len(pending_steps)} steps")
-                break
-            
-            # Execute ready steps
-            for step in ready_steps:
+        while layer:
+            next_layer = []
+            for i in layer:
+                step = steps[i]
                 await self._execute_step(execution_id, step, results, request)
-                completed_steps.add(step.id)
                 results[step.id] = step.result
+                next_layer.extend(batch.complete(i))
+            
+            remaining -= len(layer)
+            layer = next_layer
+        
+        if remaining > 0:
+            raise WorkflowCycleError(remaining)
         
         return results
     
     async def _execute_step(self, execution_id: str, step: WorkflowStep, previous_results: Dict, request: WorkflowRequest):
         """Execute a single workflow step"""
         step.status = WorkflowStatus.RUNNING
-        step.start_time = datetime.now()
+        step.start_time = time.perf_counter()
         
         # Send progress update
         await self._send_progress_update(execution_id, step.description, 0.0, "running")
         
         try:
             # Execute step action
-            step.result = await step.action(request, previous_results)
+            action = step.action if callable(step.action) else self._action_registry[step.action]
+            step.result = await action(request, previous_results)
             step.status = WorkflowStatus.COMPLETED
-            step.end_time = datetime.now()
+            step.end_time = time.perf_counter()
             
             # Send completion update
             await self._send_progress_update(execution_id, f"Completed: {step.description}", 1.0, "completed")
@@ -300,26 +437,29 @@ class WorkflowProcessor:
         except Exception as e:
             step.error = str(e)
             step.status = WorkflowStatus.FAILED
-            step.end_time = datetime.now()
+            step.end_time = time.perf_counter()
             
             # Send error update
             await self._send_progress_update(execution_id, f"Failed: {step.description}", 0.0, "error")
             raise
     
     async def _send_progress_update(self, execution_id: str, step: str, progress: float, status: str):
-        """Send progress update to callback if available"""
-        if execution_id in self.progress_callbacks:
-            callback = self.progress_callbacks[execution_id]
-            progress_update = WorkflowProgress(
+        """Send progress update to callbacks if available"""
+        callbacks = self.progress_callbacks.get(execution_id)
+        if callbacks:
+            update = WorkflowProgress(
                 step=step,
                 progress=progress,
                 status=status,
                 details=None
             )
-            try:
-                await callback(progress_update)
-            except Exception:
-                pass  # Don't fail workflow if progress callback fails
+            # Serialize once and hand the same bytes to every JSON subscriber
+            payload = update.model_dump_json().encode() if any(as_json for _, as_json in callbacks) else None
+            # Don't fail workflow if a progress callback fails
+            await asyncio.gather(
+                *(callback(payload if as_json else update) for callback, as_json in callbacks),
+                return_exceptions=True
+            )
     
     # Placeholder action implementations
     # TODO: Replace these with actual implementations
@@ -412,8 +552,12 @@ class WorkflowProcessor:
     
     def _setup_default_templates(self):
         """Setup default workflow templates"""
+        # Bind each step action once so plans can refer to actions by name
+        self._action_registry: Dict[str, Callable] = {
+            name: getattr(self, f"_{name}_action") for name in STEP_ACTIONS
+        }
+        
         # TODO: Implement workflow template system
-        pass
     
     async def _analyze_goal_complexity(self, goal: str) -> Dict[str, Any]:
         """Analyze goal complexity for task planning"""
@@ -486,36 +630,21 @@ class WorkflowProcessor:
             return "1 hour"
         
         # TODO: Implement sophisticated time estimation
-        total_hours = sum([
-            float(task.estimated_time.split()[0]) 
-            for task in tasks 
-            if task.estimated_time.split()[0].replace('.', '').isdigit()
-        ])
-        
-        if total_hours < 1:
-            return f"{int(total_hours * 60)} minutes"
-        elif total_hours < 8:
-            return f"{total_hours:.1f} hours"
-        elif total_hours < 40:
-            return f"{int(total_hours / 8)} days"
-        else:
-            return f"{int(total_hours / 40)} weeks"
+        return format_duration(total_hours(task.estimated_time or "" for task in tasks))
     
     async def _compile_workflow_results(self, results: Dict, request: WorkflowRequest) -> tuple[str, List[WorkflowArtifact]]:
         """Compile workflow execution results into final output"""
-        output = f"Workflow completed successfully for goal: {request.goal}\n\n"
-        output += "Steps completed:\n"
-        
-        for step_id, result in results.items():
-            output += f"- {result}\n"
+        parts = [f"Workflow completed successfully for goal: {request.goal}", "", "Steps completed:"]
+        parts.extend(f"- {result}" for result in results.values())
+        output = "\n".join(parts)
         
         # TODO: Generate actual artifacts based on workflow type
         artifacts = [
             WorkflowArtifact(
-                name="Workflow Summary",
-                type="markdown",
+                type="summary",
+                title="Workflow Summary",
                 content=output,
-                file_path="workflow_summary.md"
+                metadata={"file_path": "workflow_summary.md"}
             )
         ]
         
@@ -523,24 +652,30 @@ class WorkflowProcessor:
     
     def _format_workflow_result(self, output: str, artifacts: List[WorkflowArtifact]) -> str:
         """Format workflow result for display"""
-        result = output
-        if artifacts:
-            result += f"\n\nGenerated {len(artifacts)} artifacts:\n"
-            for artifact in artifacts:
-                result += f"- {artifact.name} ({artifact.type})\n"
+        if not artifacts:
+            return output
         
-        return result
+        lines = [output, "", f"Generated {len(artifacts)} artifacts:"]
+        lines.extend(f"- {artifact.title} ({artifact.type})" for artifact in artifacts)
+        return "\n".join(lines)
     
-    def _build_execution_graph(self, steps: List[WorkflowStep], results: Dict) -> Dict[str, Any]:
+    def _build_execution_graph(self, steps: List[WorkflowStep], results: Dict,
+                               started_at: datetime, start_perf: float) -> Dict[str, Any]:
         """Build execution graph for visualization"""
+        def to_iso(perf: Optional[float]) -> Optional[str]:
+            # Offset the workflow's wall-clock anchor by the monotonic elapsed time
+            if perf is None:
+                return None
+            return (started_at + timedelta(seconds=perf - start_perf)).isoformat()
+        
         return {
             "nodes": [
                 {
                     "id": step.id,
                     "name": step.name,
                     "status": step.status.value,
-                    "start_time": step.start_time.isoformat() if step.start_time else None,
-                    "end_time": step.end_time.isoformat() if step.end_time else None
+                    "start_time": to_iso(step.start_time),
+                    "end_time": to_iso(step.end_time)
                 }
                 for step in steps
             ],
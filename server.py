@@ -144,6 +144,8 @@ if __name__ == "__main__":
         "server:app",
         host="0.0.0.0",
         port=8001,
+        http="httptools",
+        ws="websockets",
         reload=True,
         log_level="info"
     )
@@ -14,6 +14,9 @@ fi
 # Activate virtual environment
 source venv/bin/activate
 
+# Install server dependencies (uvicorn[standard] brings uvloop and httptools)
+pip install -q -r "$(dirname "$0")/requirements.txt"
+
 # Kill any existing servers on port 8000
 lsof -ti:8000 | xargs kill -9 2>/dev/null || true
 
@@ -11,10 +11,48 @@ This script tests the improved WebSocket implementation to verify:
 
 import asyncio
 import websockets
-import json
+import orjson
 import time
 from datetime import datetime
 
+# Client options for the JSON test stream: no per-message deflate, 1 MiB
+# frames and a bounded receive queue
+CONNECT_OPTIONS = {
+    "compression": None,
+    "max_size": 2 ** 20,
+    "max_queue": 64,
+}
+
+# The server only logs heartbeat responses, so one frozen frame is reused
+HEARTBEAT_RESPONSE = orjson.dumps({"type": "heartbeat_response", "data": {}}).decode()
+
+# [millisecond bucket, ISO timestamp] of the last now_iso() call
+_now_cache = [0, ""]
+
+def now_iso():
+    """Current local time in ISO format, reused within the same ~1 ms"""
+    bucket = time.monotonic_ns() >> 20
+    if bucket != _now_cache[0]:
+        _now_cache[:] = [bucket, datetime.now().isoformat()]
+    return _now_cache[1]
+
+async def send_periodic_vault_updates(websocket, interval):
+    """Send a test vault update every interval seconds"""
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            test_message = {
+                "type": "vault_update",
+                "data": {
+                    "files": ["test.md"],
+                    "timestamp": now_iso()
+                }
+            }
+            await websocket.send(orjson.dumps(test_message).decode())
+            print("📤 Sent test vault update")
+    except websockets.exceptions.ConnectionClosed:
+        pass
+
 async def test_websocket_connection():
     """Test WebSocket connection with heartbeat and reconnection"""
     
@@ -26,62 +64,51 @@ async def test_websocket_connection():
         try:
             print(f"🔌 Attempting to connect to {uri} (attempt {reconnect_attempts + 1})")
             
-            async with websockets.connect(uri) as websocket:
+            async with websockets.connect(uri, **CONNECT_OPTIONS) as websocket:
                 print("✅ Connected successfully!")
                 reconnect_attempts = 0  # Reset on successful connection
                 
                 # Send initial message
-                await websocket.send(json.dumps({
+                await websocket.send(orjson.dumps({
                     "type": "request_status",
                     "data": {}
-                }))
+                }).decode())
+                
+                # Send periodic test messages until the connection closes
+                updater = asyncio.create_task(send_periodic_vault_updates(websocket, 45))
                 
                 # Listen for messages and handle heartbeats
-                async for message in websocket:
-                    try:
-                        data = json.loads(message)
-                        message_type = data.get("type", "unknown")
-                        timestamp = data.get("timestamp", "")
-                        
-                        print(f"📨 Received [{message_type}] at {timestamp}")
-                        
-                        if message_type == "heartbeat":
-                            # Respond to server heartbeat
-                            response = {
-                                "type": "heartbeat_response",
-                                "data": {
-                                    "timestamp": datetime.now().isoformat(),
-                                    "connection_id": data.get("data", {}).get("connection_id")
-                                }
-                            }
-                            await websocket.send(json.dumps(response))
-                            print("💓 Sent heartbeat response")
-                            
-                        elif message_type == "connection":
-                            print(f"🎯 Connection established with ID: {data.get('data', {}).get('connection_id')}")
-                            
-                        elif message_type == "status":
-                            print(f"📊 Status: {data.get('data', {})}")
-                            
-                        elif message_type == "error":
-                            print(f"❌ Server error: {data.get('data', {}).get('message')}")
+                try:
+                    while True:
+                        # Raw frame bytes; orjson parses them without a UTF-8 decode
+                        message = await websocket.recv(decode=False)
+                        try:
+                            data = orjson.loads(message)
+                            message_type = data.get("type", "unknown")
+                            timestamp = data.get("timestamp", "")
                             
-                        # Send periodic test messages
-                        if int(time.time()) % 45 == 0:  # Every 45 seconds
-                            test_message = {
-                                "type": "vault_update",
-                                "data": {
-                                    "files": ["test.md"],
-                                    "timestamp": datetime.now().isoformat()
-                                }
-                            }
-                            await websocket.send(json.dumps(test_message))
-                            print("📤 Sent test vault update")
+                            print(f"📨 Received [{message_type}] at {timestamp}")
                             
-                    except json.JSONDecodeError as e:
-                        print(f"⚠️ Failed to parse message: {e}")
-                    except Exception as e:
-                        print(f"⚠️ Error handling message: {e}")
+                            if message_type == "heartbeat":
+                                # Respond to server heartbeat
+                                await websocket.send(HEARTBEAT_RESPONSE)
+                                print("💓 Sent heartbeat response")
+                                
+                            elif message_type == "connection":
+                                print(f"🎯 Connection established with ID: {data.get('data', {}).get('connection_id')}")
+                                
+                            elif message_type == "status":
+                                print(f"📊 Status: {data.get('data', {})}")
+                                
+                            elif message_type == "error":
+                                print(f"❌ Server error: {data.get('data', {}).get('message')}")
+                                
+                        except orjson.JSONDecodeError as e:
+                            print(f"⚠️ Failed to parse message: {e}")
+                        except Exception as e:
+                            print(f"⚠️ Error handling message: {e}")
+                finally:
+                    updater.cancel()
                         
         except websockets.exceptions.ConnectionClosed as e:
             print(f"🔌 Connection closed: {e}")
@@ -125,30 +152,27 @@ async def test_single_connection(vault_id, duration=60):
     uri = f"ws://localhost:8001/ws/{vault_id}"
     
     try:
-        async with websockets.connect(uri) as websocket:
+        async with websockets.connect(uri, **CONNECT_OPTIONS) as websocket:
             print(f"✅ [{vault_id}] Connected")
             
             start_time = time.time()
             while time.time() - start_time < duration:
                 try:
                     # Wait for messages with timeout
-                    message = await asyncio.wait_for(websocket.recv(), timeout=10.0)
-                    data = json.loads(message)
+                    message = await asyncio.wait_for(websocket.recv(decode=False), timeout=10.0)
+                    data = orjson.loads(message)
                     print(f"📨 [{vault_id}] {data.get('type', 'unknown')}")
                     
                     # Respond to heartbeats
                     if data.get("type") == "heartbeat":
-                        await websocket.send(json.dumps({
-                            "type": "heartbeat_response",
-                            "data": {"timestamp": datetime.now().isoformat()}
-                        }))
+                        await websocket.send(HEARTBEAT_RESPONSE)
                         
                 except asyncio.TimeoutError:
                     # Send ping if no messages received
-                    await websocket.send(json.dumps({
+                    await websocket.send(orjson.dumps({
                         "type": "ping",
-                        "data": {"timestamp": datetime.now().isoformat()}
-                    }))
+                        "data": {"timestamp": now_iso()}
+                    }).decode())
                     print(f"🏓 [{vault_id}] Sent ping")
                     
     except Exception as e:
@@ -0,0 +1,38 @@
+import pytest
+
+from evoagentx_integration._planning_math import format_duration, total_hours
+
+
+@pytest.mark.parametrize(
+    ("estimate", "hours"),
+    [
+        ("30 minutes", 0.5),
+        ("1 hour", 1.0),
+        ("2 hours", 2.0),
+        ("2 hrs", 2.0),
+        ("90 min", 1.5),
+        ("1.5h", 1.5),
+        ("2", 2.0),
+        ("3 days", 24.0),
+        ("1 week", 40.0),
+        ("2 Hours of review", 2.0),
+    ],
+)
+def test_total_hours_parses_estimate_forms(estimate: str, hours: float) -> None:
+    assert total_hours([estimate]) == pytest.approx(hours)
+
+
+def test_total_hours_skips_unparseable_estimates() -> None:
+    assert total_hours(["", "soon", "2 fortnights", "1 hour"]) == pytest.approx(1.0)
+
+
+def test_total_hours_sums_mixed_units() -> None:
+    assert total_hours(["2 hrs", "90 min", "30 minutes", "4"]) == pytest.approx(8.0)
+
+
+@pytest.mark.parametrize(
+    ("hours", "rendered"),
+    [(0.5, "30 minutes"), (2.5, "2.5 hours"), (16.0, "2 days"), (80.0, "2 weeks")],
+)
+def test_format_duration(hours: float, rendered: str) -> None:
+    assert format_duration(hours) == rendered
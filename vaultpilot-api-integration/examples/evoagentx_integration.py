@@ -11,6 +11,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import uvicorn
 
 # Import the VaultPilot integration
@@ -35,6 +36,9 @@ def create_app():
         allow_headers=["*"],
     )
     
+    # Compress larger JSON bodies such as the analytics dashboard
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
+    
     # Add VaultPilot API endpoints
     vaultpilot_adapter = setup_vaultpilot_api(app)
     
@@ -71,5 +75,11 @@ if __name__ == "__main__":
         app,
         host="0.0.0.0",
         port=8002,
+        loop="uvloop",
+        http="httptools",
+        ws="websockets",
+        ws_ping_interval=20,
+        ws_ping_timeout=20,
+        ws_per_message_deflate=False,
         reload=True
     )
@@ -5,27 +5,141 @@ This module provides a complete FastAPI implementation of the VaultPilot API.
 Simply import and use with any FastAPI application.
 """
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.responses import JSONResponse
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set, Tuple
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from datetime import datetime
+import os
 import uuid
+import time
 import asyncio
+import orjson
 
 # Import types (these would be generated from TypeScript or defined separately)
 from .models import (
-    APIResponse,
     VaultAnalysisRequest,
     ChatRequest,
     WorkflowRequest,
     SummaryRequest,
     VaultInfo,
     VaultAnalysis,
+    VaultAnalysisResults,
     ChatMessage,
     Workflow,
+    WorkflowStep,
     AnalyticsDashboard,
     AgentStatus
 )
+from .responses import (
+    TS_PLACEHOLDER,
+    WORKFLOW_TEMPLATES,
+    OrjsonResponse,
+    split_at_timestamp,
+    encode_with_timestamp,
+    stamped_response
+)
+
+# Seconds a single send may take before the client is dropped as too slow
+BROADCAST_TIMEOUT = 5.0
+
+# Messages buffered per WebSocket client before new broadcasts are dropped
+CLIENT_QUEUE_SIZE = 256
+
+# Seconds the adapter's cached timestamp is reused before it is reformatted
+CLOCK_INTERVAL = 0.1
+
+# Analyses and workflows kept per store, and seconds each stays retrievable
+RECORD_LIMIT = 10_000
+RECORD_TTL = 3600.0
+
+def compute_analysis_results(vault_id: str) -> VaultAnalysisResults:
+    """Analyze a vault's content; runs in the adapter's process pool"""
+    return {
+        "fileCount": 367,
+        "wordCount": 125000,
+        "linkCount": 1250,
+        "tagCount": 85,
+        "themes": ["productivity", "AI", "automation"],
+        "suggestions": ["Consider organizing notes by theme", "Add more cross-references"],
+        "healthScore": 85
+    }
+
+# WebSocket greeting, sent to every client as it connects
+_WELCOME_FRAME = split_at_timestamp({
+    "type": "connection",
+    "data": {
+        "status": "connected",
+        "timestamp": TS_PLACEHOLDER
+    }
+})
+
+class VaultRecordStore(MutableMapping):
+    """Records keyed by id, bounded by count and age and indexed by vaultId"""
+    def __init__(self, maxsize: int = RECORD_LIMIT, ttl: float = RECORD_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        # vaultId -> ids in insertion order (dict used as an ordered set)
+        self._by_vault: Dict[str, Dict[str, None]] = {}
+    
+    def _expire(self):
+        # Records share one ttl, so insertion order is also deadline order
+        now = time.monotonic()
+        while self._data:
+            key, (deadline, _) = next(iter(self._data.items()))
+            if deadline > now:
+                break
+            del self[key]
+    
+    def __setitem__(self, key: str, record: Any):
+        if key in self._data:
+            del self[key]
+        self._data[key] = (time.monotonic() + self.ttl, record)
+        self._by_vault.setdefault(record.vaultId, {})[key] = None
+        self._expire()
+        while len(self._data) > self.maxsize:
+            del self[next(iter(self._data))]
+    
+    def __getitem__(self, key: str) -> Any:
+        deadline, record = self._data[key]
+        if deadline <= time.monotonic():
+            del self[key]
+            raise KeyError(key)
+        return record
+    
+    def __delitem__(self, key: str):
+        _, record = self._data.pop(key)
+        vault_ids = self._by_vault.get(record.vaultId)
+        if vault_ids is not None:
+            vault_ids.pop(key, None)
+            if not vault_ids:
+                del self._by_vault[record.vaultId]
+    
+    def __iter__(self):
+        self._expire()
+        return iter(self._data)
+    
+    def __len__(self):
+        self._expire()
+        return len(self._data)
+    
+    def for_vault(self, vault_id: str) -> List[Any]:
+        """Live records for one vault, oldest first"""
+        self._expire()
+        return [self._data[key][1] for key in self._by_vault.get(vault_id, ())]
+
+@dataclass(eq=False)
+class WebSocketClient:
+    """A connected WebSocket and its bounded outbound message queue"""
+    websocket: WebSocket
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE))
+    writer_task: Optional[asyncio.Task] = None
+    dropped: int = 0
 
 class VaultPilotFastAPIAdapter:
     """
@@ -33,64 +147,121 @@ class VaultPilotFastAPIAdapter:
     """
     
     def __init__(self, app: Optional[FastAPI] = None):
-        self.app = app or FastAPI()
-        self.active_connections: List[WebSocket] = []
-        self.workflows: Dict[str, Workflow] = {}
-        self.analyses: Dict[str, VaultAnalysis] = {}
+        self.app = app or FastAPI(default_response_class=OrjsonResponse)
+        self.active_connections: Set[WebSocketClient] = set()
+        self.workflows = VaultRecordStore()
+        self.analyses = VaultRecordStore()
+        
+        # CPU-bound analysis runs here so it never stalls WebSocket clients
+        self.executor = ProcessPoolExecutor(max_workers=os.cpu_count())
+        
+        # [monotonic bucket, ISO timestamp, JSON-encoded timestamp] shared by
+        # handlers, refreshed when read in a new CLOCK_INTERVAL bucket
+        self._clock: Tuple[int, str, bytes] = (-1, "", b"")
         
         # Setup routes
         self._setup_routes()
     
+    @asynccontextmanager
+    async def _lifespan(self, app: FastAPI):
+        """Startup and shutdown work, merged into the host app's lifespan"""
+        # eager_task_factory is only available on Python 3.12+; new tasks run
+        # eagerly so sends that complete immediately skip a loop trip
+        if hasattr(asyncio, "eager_task_factory"):
+            asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+        try:
+            yield
+        finally:
+            # Don't wait on analyses still running in the process pool
+            self.executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _read_clock(self) -> Tuple[int, str, bytes]:
+        """Cached clock entry, reformatted at most once per CLOCK_INTERVAL"""
+        bucket = int(time.monotonic() / CLOCK_INTERVAL)
+        if bucket != self._clock[0]:
+            now = datetime.now().isoformat()
+            self._clock = (bucket, now, orjson.dumps(now))
+        return self._clock
+    
+    @property
+    def _now_iso(self) -> str:
+        """Current local time in ISO format"""
+        return self._read_clock()[1]
+    
+    @property
+    def _now_json(self) -> bytes:
+        """Current local time in ISO format, JSON-encoded"""
+        return self._read_clock()[2]
+    
+    def _ok(self, data: Any) -> Dict[str, Any]:
+        """Success envelope as a plain dict, skipping APIResponse validation"""
+        return {"success": True, "data": data, "error": None, "timestamp": self._now_iso}
+    
     def _setup_routes(self):
         """Setup all VaultPilot API routes"""
+        # Routes live on a router so they serialize with orjson even when
+        # mounted on an existing app with a different default response class.
+        # Including the router merges its lifespan into the app's, which also
+        # covers apps built with lifespan= (startup handlers never run there)
+        router = APIRouter(default_response_class=OrjsonResponse, lifespan=self._lifespan)
+        
+        # Constant bodies are encoded once; only the timestamp varies per request
+        health_body = encode_with_timestamp({
+            "status": "healthy",
+            "timestamp": TS_PLACEHOLDER
+        })
+        status_body = encode_with_timestamp({
+            "connection": "connected",
+            "agents": {
+                "active": 1,
+                "total": 1
+            },
+            "backend": "connected",
+            "websocket": "connected",
+            "lastPing": TS_PLACEHOLDER
+        })
+        templates_body = encode_with_timestamp(WORKFLOW_TEMPLATES)
+        agent_status_body = encode_with_timestamp({
+            "totalAgents": 1,
+            "activeAgents": 1,
+            "agents": [
+                {
+                    "id": "vaultpilot-agent-1",
+                    "name": "VaultPilot Assistant",
+                    "type": "chat",
+                    "status": "active",
+                    "capabilities": ["chat", "analysis", "summarization"],
+                    "lastActivity": TS_PLACEHOLDER
+                }
+            ]
+        })
         
         # System routes
-        @self.app.get("/health")
+        @router.get("/health")
         async def health_check():
-            return APIResponse(
-                success=True,
-                data={
-                    "status": "healthy",
-                    "timestamp": datetime.now().isoformat()
-                }
-            )
+            return stamped_response(health_body, self._now_json)
         
-        @self.app.get("/api/status")
+        @router.get("/api/status")
         async def get_status():
-            return APIResponse(
-                success=True,
-                data={
-                    "connection": "connected",
-                    "agents": {
-                        "active": 1,
-                        "total": 1
-                    },
-                    "backend": "connected",
-                    "websocket": "connected",
-                    "lastPing": datetime.now().isoformat()
-                }
-            )
+            return stamped_response(status_body, self._now_json)
         
         # Vault routes
-        @self.app.get("/api/vault/info")
+        @router.get("/api/vault/info")
         async def get_vault_info(vault_id: str = "default"):
-            return APIResponse(
-                success=True,
-                data={
-                    "id": vault_id,
-                    "name": "My Vault",
-                    "path": "/path/to/vault",
-                    "totalFiles": 367,
-                    "markdownFiles": 320,
-                    "folders": 4,
-                    "lastModified": datetime.now().isoformat(),
-                    "size": 1024000
-                }
-            )
+            return self._ok({
+                "id": vault_id,
+                "name": "My Vault",
+                "path": "/path/to/vault",
+                "totalFiles": 367,
+                "markdownFiles": 320,
+                "folders": 4,
+                "lastModified": self._now_iso,
+                "size": 1024000
+            })
         
-        @self.app.post("/api/vault/analyze")
+        @router.post("/api/vault/analyze")
         async def analyze_vault(request: VaultAnalysisRequest):
-            analysis_id = str(uuid.uuid4())
+            analysis_id = uuid.uuid4().hex
             
             # Create analysis record
             analysis = VaultAnalysis(
@@ -98,88 +269,65 @@ class VaultPilotFastAPIAdapter:
                 vaultId=request.vaultId,
                 status="processing",
                 progress=0,
-                startTime=datetime.now().isoformat()
+                startTime=self._now_iso
             )
             
             self.analyses[analysis_id] = analysis
             
             # Start background analysis
-            asyncio.create_task(self._run_analysis(analysis_id))
+            asyncio.create_task(self._run_analysis(analysis))
             
-            return APIResponse(
-                success=True,
-                data={"analysisId": analysis_id}
-            )
+            return self._ok({"analysisId": analysis_id})
         
-        @self.app.get("/api/vault/analysis/{analysis_id}")
+        @router.get("/api/vault/analysis/{analysis_id}")
         async def get_analysis(analysis_id: str):
-            if analysis_id not in self.analyses:
+            analysis = self.analyses.get(analysis_id)
+            if analysis is None:
                 raise HTTPException(status_code=404, detail="Analysis not found")
             
-            return APIResponse(
-                success=True,
-                data=self.analyses[analysis_id]
-            )
+            return self._ok(analysis)
         
-        @self.app.post("/api/vault/summary")
+        @router.post("/api/vault/summary")
         async def generate_summary(request: SummaryRequest):
             # Simulate summary generation
             await asyncio.sleep(2)
             
-            return APIResponse(
-                success=True,
-                data={
-                    "summary": "Your vault contains 367 files with rich content about productivity, AI, and personal knowledge management. Key themes include workflow automation, note-taking strategies, and AI integration.",
-                    "metadata": {
-                        "wordCount": 125000,
-                        "themes": ["productivity", "AI", "automation", "knowledge management"],
-                        "generatedAt": datetime.now().isoformat()
-                    }
+            return self._ok({
+                "summary": "Your vault contains 367 files with rich content about productivity, AI, and personal knowledge management. Key themes include workflow automation, note-taking strategies, and AI integration.",
+                "metadata": {
+                    "wordCount": 125000,
+                    "themes": ["productivity", "AI", "automation", "knowledge management"],
+                    "generatedAt": self._now_iso
                 }
-            )
+            })
         
         # Chat routes
-        @self.app.post("/api/chat")
+        @router.post("/api/chat")
         async def send_chat_message(request: ChatRequest):
             # Simulate AI response
             await asyncio.sleep(1)
             
             response = ChatMessage(
-                id=str(uuid.uuid4()),
+                id=uuid.uuid4().hex,
                 role="assistant",
                 content=f"I understand you want to know about: {request.message}. Based on your vault content, here's what I found...",
-                timestamp=datetime.now().isoformat(),
+                timestamp=self._now_iso,
                 metadata={
                     "confidence": 0.85,
                     "relatedFiles": ["note1.md", "note2.md"]
                 }
             )
             
-            return APIResponse(success=True, data=response)
+            return self._ok(response)
         
         # Workflow routes
-        @self.app.get("/api/workflows/templates")
+        @router.get("/api/workflows/templates")
         async def get_workflow_templates():
-            templates = [
-                {
-                    "id": "vault-analysis",
-                    "name": "Vault Analysis",
-                    "description": "Comprehensive analysis of vault structure and content",
-                    "type": "analysis"
-                },
-                {
-                    "id": "content-summary",
-                    "name": "Content Summary",
-                    "description": "Generate summaries of vault content",
-                    "type": "summary"
-                }
-            ]
-            
-            return APIResponse(success=True, data=templates)
+            return stamped_response(templates_body, self._now_json)
         
-        @self.app.post("/api/workflows")
+        @router.post("/api/workflows")
         async def start_workflow(request: WorkflowRequest):
-            workflow_id = str(uuid.uuid4())
+            workflow_id = uuid.uuid4().hex
             
             workflow = Workflow(
                 id=workflow_id,
@@ -188,42 +336,36 @@ class VaultPilotFastAPIAdapter:
                 type=request.type,
                 status="running",
                 steps=[],
-                created=datetime.now().isoformat(),
-                updated=datetime.now().isoformat(),
+                created=self._now_iso,
+                updated=self._now_iso,
                 vaultId=request.vaultId
             )
             
             self.workflows[workflow_id] = workflow
             
             # Start background workflow
-            asyncio.create_task(self._run_workflow(workflow_id))
+            asyncio.create_task(self._run_workflow(workflow))
             
-            return APIResponse(
-                success=True,
-                data={"workflowId": workflow_id}
-            )
+            return self._ok({"workflowId": workflow_id})
         
-        @self.app.get("/api/workflows/{workflow_id}")
+        @router.get("/api/workflows/{workflow_id}")
         async def get_workflow(workflow_id: str):
-            if workflow_id not in self.workflows:
+            workflow = self.workflows.get(workflow_id)
+            if workflow is None:
                 raise HTTPException(status_code=404, detail="Workflow not found")
             
-            return APIResponse(
-                success=True,
-                data=self.workflows[workflow_id]
-            )
+            return self._ok(workflow)
         
-        @self.app.get("/api/workflows")
+        @router.get("/api/workflows")
         async def list_workflows(vault_id: str = "default"):
-            vault_workflows = [w for w in self.workflows.values() if w.vaultId == vault_id]
-            return APIResponse(success=True, data=vault_workflows)
+            return self._ok(self.workflows.for_vault(vault_id))
         
         # Analytics routes
-        @self.app.get("/api/analytics/dashboard")
+        @router.get("/api/analytics/dashboard")
         async def get_analytics_dashboard(vault_id: str = "default"):
             dashboard = {
                 "vaultId": vault_id,
-                "updated": datetime.now().isoformat(),
+                "updated": self._now_iso,
                 "metrics": {
                     "usage": [
                         {"name": "Daily Active Files", "value": 15, "trend": "up", "change": 12},
@@ -252,60 +394,93 @@ class VaultPilotFastAPIAdapter:
                 }
             }
             
-            return APIResponse(success=True, data=dashboard)
+            return self._ok(dashboard)
         
         # Agent routes
-        @self.app.get("/api/agents/status")
+        @router.get("/api/agents/status")
         async def get_agent_status():
-            return APIResponse(
-                success=True,
-                data={
-                    "totalAgents": 1,
-                    "activeAgents": 1,
-                    "agents": [
-                        {
-                            "id": "vaultpilot-agent-1",
-                            "name": "VaultPilot Assistant",
-                            "type": "chat",
-                            "status": "active",
-                            "capabilities": ["chat", "analysis", "summarization"],
-                            "lastActivity": datetime.now().isoformat()
-                        }
-                    ]
-                }
-            )
+            return stamped_response(agent_status_body, self._now_json)
         
         # WebSocket route
-        @self.app.websocket("/ws")
+        @router.websocket("/ws")
         async def websocket_endpoint(websocket: WebSocket):
             await websocket.accept()
-            self.active_connections.append(websocket)
+            client = self._register(websocket)
             
             try:
                 # Send welcome message
-                await websocket.send_json({
-                    "type": "connection",
-                    "data": {
-                        "status": "connected",
-                        "timestamp": datetime.now().isoformat()
-                    }
-                })
+                self._enqueue(client, self._now_json.join(_WELCOME_FRAME).decode())
                 
-                while True:
+                # Stop reading once the writer has dropped the client
+                while client in self.active_connections:
                     data = await websocket.receive_text()
                     # Echo back for now
-                    await websocket.send_json({
+                    self._enqueue(client, orjson.dumps({
                         "type": "message",
                         "data": {"echo": data},
-                        "timestamp": datetime.now().isoformat()
-                    })
+                        "timestamp": self._now_iso
+                    }).decode())
                     
-            except WebSocketDisconnect:
-                self.active_connections.remove(websocket)
+            except (WebSocketDisconnect, RuntimeError):
+                # RuntimeError: receive after the writer closed the socket
+                pass
+            finally:
+                self._unregister(client)
+        
+        self.app.include_router(router)
+    
+    def _register(self, websocket: WebSocket) -> WebSocketClient:
+        """Track an accepted WebSocket and start its writer task"""
+        client = WebSocketClient(websocket)
+        client.writer_task = asyncio.create_task(self._client_writer(client))
+        self.active_connections.add(client)
+        return client
+    
+    def _unregister(self, client: WebSocketClient):
+        """Stop tracking a client and cancel its writer task"""
+        self.active_connections.discard(client)
+        if client.writer_task:
+            client.writer_task.cancel()
+    
+    async def _client_writer(self, client: WebSocketClient):
+        """Drain a client's queue of encoded frames onto its socket"""
+        try:
+            while True:
+                frame = await client.queue.get()
+                await asyncio.wait_for(client.websocket.send_text(frame), BROADCAST_TIMEOUT)
+        except asyncio.TimeoutError:
+            # Too slow: close the socket so the client reconnects instead of
+            # staying connected without updates (1013: try again later)
+            self.active_connections.discard(client)
+            try:
+                await asyncio.wait_for(client.websocket.close(code=1013), BROADCAST_TIMEOUT)
+            except (asyncio.TimeoutError, WebSocketDisconnect, RuntimeError):
+                pass
+        except (WebSocketDisconnect, RuntimeError):
+            # Disconnected, or already closed (Starlette raises RuntimeError
+            # for sends after close); other errors propagate
+            pass
+        finally:
+            # Dead or slow clients never linger in active_connections
+            self._unregister(client)
+    
+    def _enqueue(self, client: WebSocketClient, frame: str):
+        """Queue a frame for one client, dropping it when the queue is full"""
+        try:
+            client.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            client.dropped += 1
     
-    async def _run_analysis(self, analysis_id: str):
+    def _broadcast(self, message: Dict[str, Any]):
+        """Encode a message once and queue the frame for every WebSocket client"""
+        # Text frames, since browser clients JSON.parse(event.data)
+        frame = orjson.dumps(message).decode()
+        for client in self.active_connections:
+            self._enqueue(client, frame)
+    
+    async def _run_analysis(self, analysis: VaultAnalysis):
         """Background task to simulate analysis"""
-        analysis = self.analyses[analysis_id]
+        analysis_id = analysis.id
         
         # Simulate progress
         for progress in [25, 50, 75, 100]:
@@ -313,35 +488,25 @@ class VaultPilotFastAPIAdapter:
             analysis.progress = progress
             
             if progress == 100:
+                analysis.results = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, compute_analysis_results, analysis.vaultId
+                )
                 analysis.status = "completed"
-                analysis.endTime = datetime.now().isoformat()
-                analysis.results = {
-                    "fileCount": 367,
-                    "wordCount": 125000,
-                    "linkCount": 1250,
-                    "tagCount": 85,
-                    "themes": ["productivity", "AI", "automation"],
-                    "suggestions": ["Consider organizing notes by theme", "Add more cross-references"],
-                    "healthScore": 85
-                }
+                analysis.endTime = self._now_iso
             
             # Notify via WebSocket
-            for connection in self.active_connections:
-                try:
-                    await connection.send_json({
-                        "type": "analysis_progress",
-                        "data": {
-                            "analysisId": analysis_id,
-                            "progress": progress,
-                            "status": analysis.status
-                        }
-                    })
-                except:
-                    pass
+            self._broadcast({
+                "type": "analysis_progress",
+                "data": {
+                    "analysisId": analysis_id,
+                    "progress": progress,
+                    "status": analysis.status
+                }
+            })
     
-    async def _run_workflow(self, workflow_id: str):
+    async def _run_workflow(self, workflow: Workflow):
         """Background task to simulate workflow execution"""
-        workflow = self.workflows[workflow_id]
+        workflow_id = workflow.id
         
         steps = [
             {"name": "Initialize", "description": "Setting up workflow"},
@@ -353,35 +518,31 @@ class VaultPilotFastAPIAdapter:
         for i, step_data in enumerate(steps):
             await asyncio.sleep(3)
             
-            step = {
-                "id": str(uuid.uuid4()),
+            step: WorkflowStep = {
+                "id": uuid.uuid4().hex,
                 "name": step_data["name"],
                 "description": step_data["description"],
                 "status": "completed",
                 "progress": 100,
-                "startTime": datetime.now().isoformat(),
-                "endTime": datetime.now().isoformat()
+                "startTime": self._now_iso,
+                "endTime": self._now_iso
             }
             
             workflow.steps.append(step)
-            workflow.updated = datetime.now().isoformat()
+            workflow.updated = self._now_iso
             
             if i == len(steps) - 1:
                 workflow.status = "completed"
             
             # Notify via WebSocket
-            for connection in self.active_connections:
-                try:
-                    await connection.send_json({
-                        "type": "workflow_update",
-                        "data": {
-                            "workflowId": workflow_id,
-                            "step": step,
-                            "status": workflow.status
-                        }
-                    })
-                except:
-                    pass
+            self._broadcast({
+                "type": "workflow_update",
+                "data": {
+                    "workflowId": workflow_id,
+                    "step": step,
+                    "status": workflow.status
+                }
+            })
 
 
 # Helper function to setup VaultPilot in an existing FastAPI app
@@ -1,21 +1,30 @@
 """
 VaultPilot Python Data Models
 
-Pydantic models for VaultPilot API data structures
+Pydantic models for VaultPilot API data structures. Nested payloads the
+server builds itself (workflow steps, analysis results, analytics) are
+TypedDicts, so they stay plain dicts instead of nested models, and
+server-side records that are never parsed from requests (Workflow, Agent)
+are slotted dataclasses.
 """
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any, Union
+from typing_extensions import NotRequired, TypedDict
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 
+# Request bodies live in their own module so servers can load them alone
+from .request_models import VaultAnalysisRequest, ChatRequest, WorkflowRequest, SummaryRequest
+
 # === Base Models ===
 
 class APIResponse(BaseModel):
     success: bool
     data: Optional[Any] = None
     error: Optional[str] = None
-    timestamp: str = datetime.now().isoformat()
+    timestamp: str = Field(default_factory=lambda: datetime.now().isoformat())
 
 # === Vault Models ===
 
@@ -40,7 +49,7 @@ class VaultFile(BaseModel):
     tags: Optional[List[str]] = None
     links: Optional[List[str]] = None
 
-class VaultAnalysisResults(BaseModel):
+class VaultAnalysisResults(TypedDict):
     fileCount: int
     wordCount: int
     linkCount: int
@@ -58,10 +67,6 @@ class VaultAnalysis(BaseModel):
     endTime: Optional[str] = None
     results: Optional[VaultAnalysisResults] = None
 
-class VaultAnalysisRequest(BaseModel):
-    vaultId: str
-    options: Optional[Dict[str, Any]] = None
-
 # === Chat Models ===
 
 class ChatMessage(BaseModel):
@@ -80,26 +85,21 @@ class ChatConversation(BaseModel):
     updated: str
     status: str  # 'active' | 'archived'
 
-class ChatRequest(BaseModel):
-    message: str
-    conversationId: Optional[str] = None
-    vaultId: str
-    context: Optional[Dict[str, Any]] = None
-
 # === Workflow Models ===
 
-class WorkflowStep(BaseModel):
+class WorkflowStep(TypedDict):
     id: str
     name: str
     description: str
     status: str  # 'pending' | 'running' | 'completed' | 'failed'
     progress: int
-    startTime: Optional[str] = None
-    endTime: Optional[str] = None
-    result: Optional[Any] = None
-    error: Optional[str] = None
+    startTime: NotRequired[Optional[str]]
+    endTime: NotRequired[Optional[str]]
+    result: NotRequired[Optional[Any]]
+    error: NotRequired[Optional[str]]
 
-class Workflow(BaseModel):
+@dataclass(slots=True)
+class Workflow:
     id: str
     name: str
     description: str
@@ -119,16 +119,10 @@ class WorkflowTemplate(BaseModel):
     steps: List[Dict[str, Any]]
     defaultConfig: Optional[Dict[str, Any]] = None
 
-class WorkflowRequest(BaseModel):
-    templateId: Optional[str] = None
-    name: str
-    type: str
-    vaultId: str
-    config: Optional[Dict[str, Any]] = None
-
 # === Agent Models ===
 
-class Agent(BaseModel):
+@dataclass(slots=True)
+class Agent:
     id: str
     name: str
     type: str
@@ -137,46 +131,41 @@ class Agent(BaseModel):
     lastActivity: Optional[str] = None
     config: Optional[Dict[str, Any]] = None
 
-class AgentStatus(BaseModel):
+@dataclass(slots=True)
+class AgentStatus:
     totalAgents: int
     activeAgents: int
     agents: List[Agent]
 
 # === Analytics Models ===
 
-class AnalyticsMetric(BaseModel):
+class AnalyticsMetric(TypedDict):
     name: str
     value: Union[int, float]
-    unit: Optional[str] = None
-    trend: Optional[str] = None  # 'up' | 'down' | 'stable'
-    change: Optional[Union[int, float]] = None
-
-class ChartDataPoint(BaseModel):
-    date: Optional[str] = None
-    category: Optional[str] = None
-    file: Optional[str] = None
-    value: Optional[Union[int, float]] = None
-    count: Optional[int] = None
-    views: Optional[int] = None
-
-class AnalyticsDashboard(BaseModel):
+    unit: NotRequired[Optional[str]]
+    trend: NotRequired[Optional[str]]  # 'up' | 'down' | 'stable'
+    change: NotRequired[Optional[Union[int, float]]]
+
+class ChartDataPoint(TypedDict, total=False):
+    date: Optional[str]
+    category: Optional[str]
+    file: Optional[str]
+    value: Optional[Union[int, float]]
+    count: Optional[int]
+    views: Optional[int]
+
+class AnalyticsDashboard(TypedDict):
     vaultId: str
     updated: str
     metrics: Dict[str, List[AnalyticsMetric]]
     charts: Dict[str, List[ChartDataPoint]]
 
-# === Request Models ===
-
-class SummaryRequest(BaseModel):
-    vaultId: str
-    options: Optional[Dict[str, Any]] = None
-
 # === WebSocket Models ===
 
 class WebSocketMessage(BaseModel):
     type: str
     data: Any
-    timestamp: str = datetime.now().isoformat()
+    timestamp: str = Field(default_factory=lambda: datetime.now().isoformat())
 
 class ConnectionStatus(BaseModel):
     backend: str  # 'connected' | 'disconnected' | 'error'
@@ -0,0 +1,31 @@
+"""
+VaultPilot Request Models
+
+Pydantic models for VaultPilot API request bodies. This module only
+depends on pydantic, so a server can load it without the rest of the
+package.
+"""
+
+from pydantic import BaseModel
+from typing import Optional, Dict, Any
+
+class VaultAnalysisRequest(BaseModel):
+    vaultId: str
+    options: Optional[Dict[str, Any]] = None
+
+class ChatRequest(BaseModel):
+    message: str
+    conversationId: Optional[str] = None
+    vaultId: str
+    context: Optional[Dict[str, Any]] = None
+
+class WorkflowRequest(BaseModel):
+    templateId: Optional[str] = None
+    name: str
+    type: str
+    vaultId: str
+    config: Optional[Dict[str, Any]] = None
+
+class SummaryRequest(BaseModel):
+    vaultId: str
+    options: Optional[Dict[str, Any]] = None
@@ -0,0 +1,47 @@
+"""
+VaultPilot Pre-encoded Responses
+
+Response class and constant response payloads shared by the VaultPilot
+servers. Constant bodies are encoded once with orjson and split at each
+timestamp placeholder, so a request only joins in the current timestamp.
+"""
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from typing import List, Any
+import orjson
+
+class OrjsonResponse(JSONResponse):
+    """JSON response encoded with orjson (FastAPI deprecates its ORJSONResponse)"""
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+# Stands in for the current time in pre-encoded response bodies
+TS_PLACEHOLDER = "__timestamp__"
+
+WORKFLOW_TEMPLATES = [
+    {
+        "id": "vault-analysis",
+        "name": "Vault Analysis",
+        "description": "Comprehensive analysis of vault structure and content",
+        "type": "analysis"
+    },
+    {
+        "id": "content-summary",
+        "name": "Content Summary",
+        "description": "Generate summaries of vault content",
+        "type": "summary"
+    }
+]
+
+def split_at_timestamp(payload: Any) -> List[bytes]:
+    """Pre-encode payload, split at each timestamp placeholder"""
+    return orjson.dumps(payload).split(orjson.dumps(TS_PLACEHOLDER))
+
+def encode_with_timestamp(data: Any) -> List[bytes]:
+    """Pre-encode a success envelope around data, split at each timestamp placeholder"""
+    return split_at_timestamp({"success": True, "data": data, "error": None, "timestamp": TS_PLACEHOLDER})
+
+def stamped_response(parts: List[bytes], timestamp: bytes) -> Response:
+    """Join pre-encoded body parts around a JSON-encoded timestamp"""
+    return Response(content=timestamp.join(parts), media_type="application/json")
@@ -9,42 +9,66 @@ No confusion, no multiple servers - just one that works.
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import Response
-from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Tuple
+from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
+from types import ModuleType
+import importlib.util
+import os
+import sys
+import time
 import uuid
 import asyncio
+import logging
+import orjson
 import uvicorn
 
-# === Data Models ===
+logger = logging.getLogger(__name__)
+
+# Shared request models and response helpers live in the integration
+# package. Each module is loaded by file path under its own name, so the
+# package __init__ (which imports the FastAPI adapter) never runs and no
+# top-level "python" package lands on sys.path
+SHARED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "vaultpilot-api-integration", "python")
+
+def load_shared(name: str) -> ModuleType:
+    """Import one module of the integration package by file path"""
+    spec = importlib.util.spec_from_file_location(f"vaultpilot_{name}", os.path.join(SHARED_DIR, f"{name}.py"))
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load shared module {name!r} from {SHARED_DIR}")
+    module = importlib.util.module_from_spec(spec)
+    # Registered before executing so pydantic can resolve the module's types
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+if TYPE_CHECKING:
+    # Same modules, resolved through mypy_path so the names carry real types
+    from python.request_models import VaultAnalysisRequest, ChatRequest, WorkflowRequest, SummaryRequest
+    from python.responses import (
+        TS_PLACEHOLDER,
+        WORKFLOW_TEMPLATES,
+        OrjsonResponse,
+        encode_with_timestamp,
+        stamped_response
+    )
+else:
+    request_models = load_shared("request_models")
+    VaultAnalysisRequest = request_models.VaultAnalysisRequest
+    ChatRequest = request_models.ChatRequest
+    WorkflowRequest = request_models.WorkflowRequest
+    SummaryRequest = request_models.SummaryRequest
+    
+    responses = load_shared("responses")
+    TS_PLACEHOLDER = responses.TS_PLACEHOLDER
+    WORKFLOW_TEMPLATES = responses.WORKFLOW_TEMPLATES
+    OrjsonResponse = responses.OrjsonResponse
+    encode_with_timestamp = responses.encode_with_timestamp
+    stamped_response = responses.stamped_response
 
-class APIResponse(BaseModel):
-    success: bool
-    data: Optional[Any] = None
-    error: Optional[str] = None
-    timestamp: str = datetime.now().isoformat()
-
-class VaultAnalysisRequest(BaseModel):
-    vaultId: str
-    options: Optional[Dict[str, Any]] = None
-
-class ChatRequest(BaseModel):
-    message: str
-    conversationId: Optional[str] = None
-    vaultId: str
-    context: Optional[Dict[str, Any]] = None
-
-class WorkflowRequest(BaseModel):
-    templateId: Optional[str] = None
-    name: str
-    type: str
-    vaultId: str
-    config: Optional[Dict[str, Any]] = None
-
-class SummaryRequest(BaseModel):
-    vaultId: str
-    options: Optional[Dict[str, Any]] = None
+# === Data Models ===
 
 class TaskPlanningRequest(BaseModel):
     goal: str
@@ -52,38 +76,141 @@ class TaskPlanningRequest(BaseModel):
     context: Optional[str] = None
     constraints: Optional[List[str]] = None
 
-class Task(BaseModel):
+# Task plans are built by the server, never parsed from clients
+
+@dataclass(slots=True)
+class Task:
     id: str
     title: str
     description: str
-    priority: str = "medium"
     estimated_time: str
-    dependencies: List[str] = []
+    priority: str = "medium"
+    dependencies: List[str] = field(default_factory=list)
     status: str = "pending"
 
-class TaskPlan(BaseModel):
+@dataclass(slots=True)
+class TaskPlan:
     title: str
     description: str
     tasks: List[Task]
     estimated_duration: str
 
-class Milestone(BaseModel):
+@dataclass(slots=True)
+class Milestone:
     title: str
     description: str
     target_date: str
-    tasks: List[str] = []
+    tasks: List[str] = field(default_factory=list)
 
-class TaskPlanningResponse(BaseModel):
+@dataclass(slots=True)
+class TaskPlanningResponse:
     plan: TaskPlan
     timeline: str
-    milestones: List[Milestone] = []
+    milestones: List[Milestone] = field(default_factory=list)
+
+# (epoch second, ISO timestamp, JSON-encoded timestamp) of the last refresh
+_ts_cache: Tuple[int, str, bytes] = (0, "", b"")
+
+def _refresh_ts() -> Tuple[int, str, bytes]:
+    """Reformat the cached timestamp at most once per second"""
+    global _ts_cache
+    second = int(time.time())
+    if second != _ts_cache[0]:
+        now = datetime.fromtimestamp(second).isoformat()
+        _ts_cache = (second, now, orjson.dumps(now))
+    return _ts_cache
+
+def now_iso() -> str:
+    """Current local time in ISO format, truncated to the second"""
+    return _refresh_ts()[1]
+
+def now_json() -> bytes:
+    """Current local time in ISO format, JSON-encoded for pre-encoded bodies"""
+    return _refresh_ts()[2]
+
+def ok(data: Any) -> Dict[str, Any]:
+    """Success envelope as a plain dict, skipping APIResponse validation"""
+    return {"success": True, "data": data, "error": None, "timestamp": now_iso()}
+
+# === Pre-encoded Responses ===
+
+_TEMPLATES_BODY = encode_with_timestamp(WORKFLOW_TEMPLATES)
+_STATUS_BODY = orjson.dumps({"status": "ok", "version": "1.0.0"})
+_HEALTH_BODY = encode_with_timestamp({
+    "status": "healthy",
+    "timestamp": TS_PLACEHOLDER
+})
+_AGENT_STATUS_BODY = encode_with_timestamp({
+    "totalAgents": 1,
+    "activeAgents": 1,
+    "agents": [
+        {
+            "id": "vaultpilot-agent-1",
+            "name": "VaultPilot Assistant",
+            "type": "chat",
+            "status": "active",
+            "capabilities": ["chat", "analysis", "summarization"],
+            "lastActivity": TS_PLACEHOLDER
+        }
+    ]
+})
+_OBSIDIAN_HEALTH_BODY = encode_with_timestamp({
+    "status": "ok",
+    "version": "1.0.0",
+    "features": ["vault_management", "chat", "workflows"],
+    "timestamp": TS_PLACEHOLDER
+})
+
+# Stands in for the client-supplied vault id in the pre-encoded dashboard
+VAULT_PLACEHOLDER = "__vault_id__"
+
+_DASHBOARD_BODY = encode_with_timestamp({
+    "vaultId": VAULT_PLACEHOLDER,
+    "updated": TS_PLACEHOLDER,
+    "metrics": {
+        "usage": [
+            {"name": "Daily Active Files", "value": 15, "trend": "up", "change": 12},
+            {"name": "Weekly Sessions", "value": 42, "trend": "up", "change": 8}
+        ],
+        "performance": [
+            {"name": "Avg Response Time", "value": 1.2, "unit": "seconds", "trend": "down"},
+            {"name": "Success Rate", "value": 98.5, "unit": "%", "trend": "stable"}
+        ],
+        "content": [
+            {"name": "Total Notes", "value": 320, "trend": "up", "change": 5},
+            {"name": "Word Count", "value": 125000, "trend": "up", "change": 2300}
+        ]
+    },
+    "charts": {
+        "activityOverTime": [
+            {"date": "2025-07-01", "value": 25},
+            {"date": "2025-07-02", "value": 32},
+            {"date": "2025-07-03", "value": 28}
+        ],
+        "contentDistribution": [
+            {"category": "Notes", "count": 320},
+            {"category": "Images", "count": 42},
+            {"category": "PDFs", "count": 5}
+        ]
+    }
+})
+
+@lru_cache(maxsize=32)
+def dashboard_body(vault_id: str) -> List[bytes]:
+    """Pre-encoded analytics dashboard for one vault, split at its timestamps"""
+    # Spliced in after the timestamp split, so no vault id can be taken
+    # for a timestamp placeholder
+    vault_json = orjson.dumps(vault_id)
+    placeholder = orjson.dumps(VAULT_PLACEHOLDER)
+    return [part.replace(placeholder, vault_json) for part in _DASHBOARD_BODY]
 
 # === Main Application ===
 
 app = FastAPI(
     title="VaultPilot Server",
     description="Complete VaultPilot API implementation",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=OrjsonResponse
 )
 
 # CORS setup
@@ -95,27 +222,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@dataclass(slots=True)
+class BroadcastClient:
+    """A connected WebSocket's bounded broadcast queue and the task sending it"""
+    queue: asyncio.Queue
+    writer: asyncio.Task
+
 # Store active connections and data
-active_connections: List[WebSocket] = []
+active_connections: Dict[WebSocket, BroadcastClient] = {}
 workflows: Dict[str, Any] = {}
 analyses: Dict[str, Any] = {}
 
+# Most WebSocket clients tracked at once; later clients are closed with 1013
+MAX_CONNECTIONS = 10_000
+
+# Concurrent broadcast sends across all clients, and seconds one send may
+# take before the client is evicted as too slow
+SEND_CONCURRENCY = 256
+SEND_TIMEOUT = 5.0
+
+# Broadcast frames buffered per client; frames for a full queue are dropped
+CLIENT_QUEUE_SIZE = 256
+
+# Seconds the broadcaster collects published updates before sending them
+BROADCAST_WINDOW = 0.1
+
+# Updates published by background tasks, drained by the broadcaster task,
+# and the slots bounding concurrent sends. All are created by
+# start_broadcaster on the serving loop, since asyncio primitives bind to
+# the first loop that uses them
+broadcast_queue: Optional[asyncio.Queue] = None
+broadcaster_task: Optional[asyncio.Task] = None
+send_slots: Optional[asyncio.Semaphore] = None
+
+# === Startup ===
+
+# Minimal valid body for each request model, validated once at boot
+WARMUP_SAMPLES = {
+    VaultAnalysisRequest: {"vaultId": "warmup"},
+    ChatRequest: {"message": "warmup", "vaultId": "warmup"},
+    WorkflowRequest: {"name": "warmup", "type": "analysis", "vaultId": "warmup"},
+    SummaryRequest: {"vaultId": "warmup"},
+    TaskPlanningRequest: {"goal": "warmup"}
+}
+
+async def warm_validators():
+    """Run each request validator once so first requests skip any lazy setup"""
+    for model, sample in WARMUP_SAMPLES.items():
+        model.model_validate(sample)
+
+app.router.add_event_handler("startup", warm_validators)
+
 # === Core Endpoints ===
 
-@app.get("/health")
+@app.get("/health", response_class=Response)
 async def health_check():
-    return APIResponse(
-        success=True,
-        data={
-            "status": "healthy",
-            "timestamp": datetime.now().isoformat()
-        }
-    )
+    return stamped_response(_HEALTH_BODY, now_json())
 
 # Standardized status endpoint for simple liveness probes
-@app.get("/status")
+@app.get("/status", response_class=Response)
 async def status_check():
-    return {"status": "ok", "version": "1.0.0"}
+    return Response(content=_STATUS_BODY, media_type="application/json")
 
 @app.head("/status")
 async def status_head():
@@ -123,32 +290,29 @@ async def status_head():
 
 @app.get("/api/status") 
 async def get_status():
-    return APIResponse(
-        success=True,
-        data={
-            "connection": "connected",
-            "agents": {
-                "active": 1,
-                "total": 1
-            },
-            "backend": "connected",
-            "websocket": "connected",
-            "lastPing": datetime.now().isoformat()
-        }
-    )
+    return ok({
+        "connection": "connected",
+        "agents": {
+            "active": 1,
+            "total": 1
+        },
+        "backend": "connected",
+        "websocket": "connected",
+        "lastPing": now_iso()
+    })
 
 # === Vault Endpoints ===
 
 @app.post("/api/vault/analyze")
 async def analyze_vault(request: VaultAnalysisRequest):
-    analysis_id = str(uuid.uuid4())
+    analysis_id = uuid.uuid4().hex
     
     analysis = {
         "id": analysis_id,
         "vaultId": request.vaultId,
         "status": "processing",
         "progress": 0,
-        "startTime": datetime.now().isoformat()
+        "startTime": now_iso()
     }
     
     analyses[analysis_id] = analysis
@@ -156,36 +320,27 @@ async def analyze_vault(request: VaultAnalysisRequest):
     # Start background analysis
     asyncio.create_task(run_analysis(analysis_id))
     
-    return APIResponse(
-        success=True,
-        data={"analysisId": analysis_id}
-    )
+    return ok({"analysisId": analysis_id})
 
 @app.get("/api/vault/analysis/{analysis_id}")
 async def get_analysis(analysis_id: str):
     if analysis_id not in analyses:
         raise HTTPException(status_code=404, detail="Analysis not found")
     
-    return APIResponse(
-        success=True,
-        data=analyses[analysis_id]
-    )
+    return ok(analyses[analysis_id])
 
 @app.post("/api/vault/summary")
 async def generate_summary(request: SummaryRequest):
     await asyncio.sleep(2)  # Simulate processing
     
-    return APIResponse(
-        success=True,
-        data={
-            "summary": "Your vault contains 367 files with rich content about productivity, AI, and personal knowledge management. Key themes include workflow automation, note-taking strategies, and AI integration.",
-            "metadata": {
-                "wordCount": 125000,
-                "themes": ["productivity", "AI", "automation", "knowledge management"],
-                "generatedAt": datetime.now().isoformat()
-            }
+    return ok({
+        "summary": "Your vault contains 367 files with rich content about productivity, AI, and personal knowledge management. Key themes include workflow automation, note-taking strategies, and AI integration.",
+        "metadata": {
+            "wordCount": 125000,
+            "themes": ["productivity", "AI", "automation", "knowledge management"],
+            "generatedAt": now_iso()
         }
-    )
+    })
 
 # === Chat Endpoints ===
 
@@ -194,42 +349,27 @@ async def send_chat_message(request: ChatRequest):
     await asyncio.sleep(1)  # Simulate AI processing
     
     response = {
-        "id": str(uuid.uuid4()),
+        "id": uuid.uuid4().hex,
         "role": "assistant", 
         "content": f"I understand you want to know about: {request.message}. Based on your vault content, here's what I found...",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": now_iso(),
         "metadata": {
             "confidence": 0.85,
             "relatedFiles": ["note1.md", "note2.md"]
         }
     }
     
-    return APIResponse(success=True, data=response)
+    return ok(response)
 
 # === Workflow Endpoints ===
 
-@app.get("/api/workflows/templates")
+@app.get("/api/workflows/templates", response_class=Response)
 async def get_workflow_templates():
-    templates = [
-        {
-            "id": "vault-analysis",
-            "name": "Vault Analysis",
-            "description": "Comprehensive analysis of vault structure and content",
-            "type": "analysis"
-        },
-        {
-            "id": "content-summary", 
-            "name": "Content Summary",
-            "description": "Generate summaries of vault content",
-            "type": "summary"
-        }
-    ]
-    
-    return APIResponse(success=True, data=templates)
+    return stamped_response(_TEMPLATES_BODY, now_json())
 
 @app.post("/api/workflows")
 async def start_workflow(request: WorkflowRequest):
-    workflow_id = str(uuid.uuid4())
+    workflow_id = uuid.uuid4().hex
     
     workflow = {
         "id": workflow_id,
@@ -238,8 +378,8 @@ async def start_workflow(request: WorkflowRequest):
         "type": request.type,
         "status": "running",
         "steps": [],
-        "created": datetime.now().isoformat(),
-        "updated": datetime.now().isoformat(),
+        "created": now_iso(),
+        "updated": now_iso(),
         "vaultId": request.vaultId
     }
     
@@ -248,95 +388,63 @@ async def start_workflow(request: WorkflowRequest):
     # Start background workflow
     asyncio.create_task(run_workflow(workflow_id))
     
-    return APIResponse(
-        success=True,
-        data={"workflowId": workflow_id}
-    )
+    return ok({"workflowId": workflow_id})
 
 @app.get("/api/workflows/{workflow_id}")
 async def get_workflow(workflow_id: str):
     if workflow_id not in workflows:
         raise HTTPException(status_code=404, detail="Workflow not found")
     
-    return APIResponse(success=True, data=workflows[workflow_id])
+    return ok(workflows[workflow_id])
 
 @app.get("/api/workflows")
 async def list_workflows(vault_id: str = "default"):
     vault_workflows = [w for w in workflows.values() if w["vaultId"] == vault_id]
-    return APIResponse(success=True, data=vault_workflows)
+    return ok(vault_workflows)
 
 # === Analytics Endpoints ===
 
-@app.get("/api/analytics/dashboard") 
+@app.get("/api/analytics/dashboard", response_class=Response)
 async def get_analytics_dashboard(vault_id: str = "default"):
-    dashboard = {
-        "vaultId": vault_id,
-        "updated": datetime.now().isoformat(),
-        "metrics": {
-            "usage": [
-                {"name": "Daily Active Files", "value": 15, "trend": "up", "change": 12},
-                {"name": "Weekly Sessions", "value": 42, "trend": "up", "change": 8}
-            ],
-            "performance": [
-                {"name": "Avg Response Time", "value": 1.2, "unit": "seconds", "trend": "down"},
-                {"name": "Success Rate", "value": 98.5, "unit": "%", "trend": "stable"}
-            ],
-            "content": [
-                {"name": "Total Notes", "value": 320, "trend": "up", "change": 5},
-                {"name": "Word Count", "value": 125000, "trend": "up", "change": 2300}
-            ]
-        },
-        "charts": {
-            "activityOverTime": [
-                {"date": "2025-07-01", "value": 25},
-                {"date": "2025-07-02", "value": 32}, 
-                {"date": "2025-07-03", "value": 28}
-            ],
-            "contentDistribution": [
-                {"category": "Notes", "count": 320},
-                {"category": "Images", "count": 42},
-                {"category": "PDFs", "count": 5}
-            ]
-        }
-    }
-    
-    return APIResponse(success=True, data=dashboard)
+    return stamped_response(dashboard_body(vault_id), now_json())
 
 # === Agent Endpoints ===
 
-@app.get("/api/agents/status")
+@app.get("/api/agents/status", response_class=Response)
 async def get_agent_status():
-    return APIResponse(
-        success=True,
-        data={
-            "totalAgents": 1,
-            "activeAgents": 1,
-            "agents": [
-                {
-                    "id": "vaultpilot-agent-1",
-                    "name": "VaultPilot Assistant",
-                    "type": "chat",
-                    "status": "active",
-                    "capabilities": ["chat", "analysis", "summarization"],
-                    "lastActivity": datetime.now().isoformat()
-                }
-            ]
-        }
-    )
+    return stamped_response(_AGENT_STATUS_BODY, now_json())
 
 # === WebSocket ===
 
+async def accept_client(websocket: WebSocket) -> bool:
+    """Accept and track a WebSocket, or close it when the server is full or not started"""
+    await websocket.accept()
+    if send_slots is None or len(active_connections) >= MAX_CONNECTIONS:
+        # 1013: try again later
+        await websocket.close(code=1013)
+        return False
+    queue: asyncio.Queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+    writer = asyncio.create_task(client_writer(websocket, queue, send_slots))
+    active_connections[websocket] = BroadcastClient(queue, writer)
+    return True
+
+def drop_client(websocket: WebSocket):
+    """Stop broadcasting to a client and cancel its writer task"""
+    client = active_connections.pop(websocket, None)
+    if client is not None and client.writer is not asyncio.current_task():
+        client.writer.cancel()
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    await websocket.accept()
-    active_connections.append(websocket)
+    if not await accept_client(websocket):
+        return
     
     try:
         await websocket.send_json({
             "type": "connection",
             "data": {
                 "status": "connected",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso()
             }
         })
         
@@ -345,17 +453,20 @@ async def websocket_endpoint(websocket: WebSocket):
             await websocket.send_json({
                 "type": "message",
                 "data": {"echo": data},
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso()
             })
             
-    except WebSocketDisconnect:
-        active_connections.remove(websocket)
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: the socket was closed by evict()
+        pass
+    finally:
+        drop_client(websocket)
 
 @app.websocket("/api/obsidian/ws/enhanced")
 async def enhanced_websocket_endpoint(websocket: WebSocket):
     """Enhanced WebSocket endpoint for VaultPilot real-time communication"""
-    await websocket.accept()
-    active_connections.append(websocket)
+    if not await accept_client(websocket):
+        return
     
     try:
         await websocket.send_json({
@@ -364,7 +475,7 @@ async def enhanced_websocket_endpoint(websocket: WebSocket):
                 "status": "connected",
                 "enhanced": True,
                 "features": ["real-time-updates", "vault-sync", "agent-status"],
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso()
             }
         })
         
@@ -373,15 +484,14 @@ async def enhanced_websocket_endpoint(websocket: WebSocket):
             
             # Parse and handle different message types
             try:
-                import json
-                message = json.loads(data) if isinstance(data, str) else data
+                message = orjson.loads(data)
                 message_type = message.get("type", "message") if isinstance(message, dict) else "raw"
                 
                 response = {
                     "type": "response",
                     "original_type": message_type,
                     "data": {"echo": data, "processed": True},
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": now_iso()
                 }
                 
                 await websocket.send_json(response)
@@ -390,29 +500,124 @@ async def enhanced_websocket_endpoint(websocket: WebSocket):
                 await websocket.send_json({
                     "type": "error",
                     "data": {"error": str(e), "original_data": data},
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": now_iso()
                 })
             
-    except WebSocketDisconnect:
-        if websocket in active_connections:
-            active_connections.remove(websocket)
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: the socket was closed by evict()
+        pass
+    finally:
+        drop_client(websocket)
 
 # Backward/forward compatible alias used by some clients
 @app.websocket("/ws/obsidian")
 async def websocket_obsidian_endpoint(websocket: WebSocket):
-    await websocket.accept()
-    active_connections.append(websocket)
+    if not await accept_client(websocket):
+        return
     try:
         await websocket.send_json({"type": "connection", "data": {"status": "connected"}})
         while True:
             data = await websocket.receive_text()
             await websocket.send_json({"type": "response", "data": {"echo": data}})
-    except WebSocketDisconnect:
-        if websocket in active_connections:
-            active_connections.remove(websocket)
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: the socket was closed by evict()
+        pass
+    finally:
+        drop_client(websocket)
 
 # === Background Tasks ===
 
+async def client_writer(websocket: WebSocket, queue: asyncio.Queue, slots: asyncio.Semaphore):
+    """Send a client's queued broadcast frames, evicting it if a send stalls"""
+    try:
+        while True:
+            frame = await queue.get()
+            async with slots:
+                await asyncio.wait_for(websocket.send_text(frame), SEND_TIMEOUT)
+    except asyncio.TimeoutError:
+        await evict(websocket)
+    except (WebSocketDisconnect, RuntimeError):
+        # Disconnected mid-send, or already closed (Starlette raises
+        # RuntimeError)
+        drop_client(websocket)
+
+def broadcast(frame: str):
+    """Queue one encoded frame for every client without waiting on any send"""
+    for client in active_connections.values():
+        try:
+            client.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # The writer is stuck on a send and will be evicted shortly
+            pass
+
+async def evict(websocket: WebSocket):
+    """Stop broadcasting to a client that was too slow and close its socket"""
+    drop_client(websocket)
+    # A cancelled send may have left the socket mid-frame, so it is closed
+    # rather than reused; the client reconnects (1013: try again later)
+    try:
+        await asyncio.wait_for(websocket.close(code=1013), SEND_TIMEOUT)
+    except (asyncio.TimeoutError, WebSocketDisconnect, RuntimeError):
+        pass
+
+def publish(message: Dict[str, Any]):
+    """Queue an update for the broadcaster; dropped while it is not running"""
+    if broadcast_queue is not None:
+        broadcast_queue.put_nowait(message)
+
+def coalesce(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep only the latest progress update per analysis, in publish order"""
+    latest = {}
+    for index, message in enumerate(batch):
+        if message["type"] == "analysis_progress":
+            latest[message["data"]["analysisId"]] = index
+    return [
+        message for index, message in enumerate(batch)
+        if message["type"] != "analysis_progress" or latest[message["data"]["analysisId"]] == index
+    ]
+
+async def broadcaster(queue: asyncio.Queue):
+    """Collect published updates for one window at a time and broadcast them"""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + BROADCAST_WINDOW
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        # Encode the whole tick before queueing so every client gets the
+        # same frame objects
+        frames = [orjson.dumps(message).decode() for message in coalesce(batch)]
+        for frame in frames:
+            broadcast(frame)
+
+def log_broadcaster_exit(task: asyncio.Task):
+    """Log the broadcaster stopping for any reason but cancellation"""
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Broadcaster stopped; WebSocket updates are no longer sent", exc_info=task.exception())
+
+async def start_broadcaster():
+    """Create the broadcast state and start the broadcaster on the running loop"""
+    global broadcast_queue, broadcaster_task, send_slots
+    send_slots = asyncio.Semaphore(SEND_CONCURRENCY)
+    broadcast_queue = asyncio.Queue()
+    broadcaster_task = asyncio.create_task(broadcaster(broadcast_queue))
+    broadcaster_task.add_done_callback(log_broadcaster_exit)
+
+async def stop_broadcaster():
+    """Cancel the broadcaster task and drop the broadcast state"""
+    global broadcast_queue, broadcaster_task, send_slots
+    if broadcaster_task:
+        broadcaster_task.cancel()
+    broadcast_queue = None
+    broadcaster_task = None
+    send_slots = None
+
+app.router.add_event_handler("startup", start_broadcaster)
+app.router.add_event_handler("shutdown", stop_broadcaster)
+
 async def run_analysis(analysis_id: str):
     """Background task for vault analysis"""
     analysis = analyses[analysis_id]
@@ -423,7 +628,7 @@ async def run_analysis(analysis_id: str):
         
         if progress == 100:
             analysis["status"] = "completed"
-            analysis["endTime"] = datetime.now().isoformat()
+            analysis["endTime"] = now_iso()
             analysis["results"] = {
                 "fileCount": 367,
                 "wordCount": 125000,
@@ -435,62 +640,51 @@ async def run_analysis(analysis_id: str):
             }
         
         # Notify via WebSocket
-        for connection in active_connections:
-            try:
-                await connection.send_json({
-                    "type": "analysis_progress",
-                    "data": {
-                        "analysisId": analysis_id,
-                        "progress": progress,
-                        "status": analysis["status"]
-                    }
-                })
-            except:
-                pass
+        publish({
+            "type": "analysis_progress",
+            "data": {
+                "analysisId": analysis_id,
+                "progress": progress,
+                "status": analysis["status"]
+            }
+        })
+
+# Fixed fields of each simulated workflow step, in execution order
+WORKFLOW_STEP_TEMPLATES = tuple(
+    {"name": name, "description": description, "status": "completed", "progress": 100}
+    for name, description in (
+        ("Initialize", "Setting up workflow"),
+        ("Process", "Processing vault data"),
+        ("Analyze", "Analyzing results"),
+        ("Complete", "Finalizing results")
+    )
+)
 
 async def run_workflow(workflow_id: str):
     """Background task for workflow execution"""
     workflow = workflows[workflow_id]
     
-    steps = [
-        {"name": "Initialize", "description": "Setting up workflow"},
-        {"name": "Process", "description": "Processing vault data"},
-        {"name": "Analyze", "description": "Analyzing results"},
-        {"name": "Complete", "description": "Finalizing results"}
-    ]
-    
-    for i, step_data in enumerate(steps):
+    for i, template in enumerate(WORKFLOW_STEP_TEMPLATES):
         await asyncio.sleep(3)
         
-        step = {
-            "id": str(uuid.uuid4()),
-            "name": step_data["name"],
-            "description": step_data["description"],
-            "status": "completed",
-            "progress": 100,
-            "startTime": datetime.now().isoformat(),
-            "endTime": datetime.now().isoformat()
-        }
+        timestamp = now_iso()
+        step = {"id": uuid.uuid4().hex, **template, "startTime": timestamp, "endTime": timestamp}
         
         workflow["steps"].append(step)
-        workflow["updated"] = datetime.now().isoformat()
+        workflow["updated"] = timestamp
         
-        if i == len(steps) - 1:
+        if i == len(WORKFLOW_STEP_TEMPLATES) - 1:
             workflow["status"] = "completed"
         
         # Notify via WebSocket
-        for connection in active_connections:
-            try:
-                await connection.send_json({
-                    "type": "workflow_update",
-                    "data": {
-                        "workflowId": workflow_id,
-                        "step": step,
-                        "status": workflow["status"]
-                    }
-                })
-            except:
-                pass
+        publish({
+            "type": "workflow_update",
+            "data": {
+                "workflowId": workflow_id,
+                "step": step,
+                "status": workflow["status"]
+            }
+        })
 
 # === Additional Vault Management Endpoints ===
 
@@ -519,7 +713,7 @@ async def get_vault_structure(request: dict):
                     "path": "/README.md",
                     "name": "README.md",
                     "size": 2048,
-                    "modified": datetime.now().isoformat(),
+                    "modified": now_iso(),
                     "file_type": "markdown"
                 }
             ]
@@ -529,25 +723,17 @@ async def get_vault_structure(request: dict):
                 "path": "/Daily Notes/2025-07-05.md",
                 "name": "2025-07-05.md",
                 "size": 1024,
-                "modified": datetime.now().isoformat(),
+                "modified": now_iso(),
                 "file_type": "markdown"
             }
         ],
         "orphaned_files": []
     }
 
-@app.get("/api/obsidian/health")
+@app.get("/api/obsidian/health", response_class=Response)
 async def obsidian_health():
     """Obsidian-specific health check"""
-    return APIResponse(
-        success=True,
-        data={
-            "status": "ok",
-            "version": "1.0.0",
-            "features": ["vault_management", "chat", "workflows"],
-            "timestamp": datetime.now().isoformat()
-        }
-    )
+    return stamped_response(_OBSIDIAN_HEALTH_BODY, now_json())
 
 @app.post("/api/obsidian/chat")
 async def obsidian_chat(request: dict):
@@ -556,14 +742,11 @@ async def obsidian_chat(request: dict):
     
     await asyncio.sleep(1)  # Simulate AI processing
     
-    return APIResponse(
-        success=True,
-        data={
-            "response": f"I understand you're asking about: {message}. Based on your vault content, here's my analysis...",
-            "conversation_id": str(uuid.uuid4()),
-            "timestamp": datetime.now().isoformat()
-        }
-    )
+    return ok({
+        "response": f"I understand you're asking about: {message}. Based on your vault content, here's my analysis...",
+        "conversation_id": uuid.uuid4().hex,
+        "timestamp": now_iso()
+    })
 
 @app.post("/api/obsidian/workflow")
 async def obsidian_workflow(request: dict):
@@ -572,18 +755,15 @@ async def obsidian_workflow(request: dict):
     
     await asyncio.sleep(2)  # Simulate processing
     
-    return APIResponse(
-        success=True,
-        data={
-            "result": f"Workflow completed for goal: {goal}",
-            "steps": ["Analyzed vault content", "Generated insights"],
-            "output": "Based on your vault content, here are the key insights...",
-            "metadata": {
-                "execution_time": "2.3 seconds",
-                "files_analyzed": 15
-            }
+    return ok({
+        "result": f"Workflow completed for goal: {goal}",
+        "steps": ["Analyzed vault content", "Generated insights"],
+        "output": "Based on your vault content, here are the key insights...",
+        "metadata": {
+            "execution_time": "2.3 seconds",
+            "files_analyzed": 15
         }
-    )
+    })
 
 if __name__ == "__main__":
     print("🚀 VaultPilot Server - Single Clean Implementation")
@@ -601,9 +781,14 @@ if __name__ == "__main__":
     print("🔧 Configure VaultPilot to use: http://localhost:8000")
     print("")
     
+    # uvloop and httptools come with uvicorn[standard] (requirements.txt);
+    # fall back to asyncio and h11 when only plain uvicorn is installed
     uvicorn.run(
         app,
         host="0.0.0.0",
         port=8000,
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") else "h11",
+        ws="websockets",
         reload=False
     )